@@ -3,12 +3,14 @@ import Webcam from 'react-webcam'
 import { Camera, CheckCircle, XCircle, RotateCcw, ArrowLeft, ArrowRight, Maximize2, Upload } from 'lucide-react'
 import { VerificationData } from '../types'
 import { validateEmiratesIDWithBackend } from '../services/ocrService'
+import { compressImageWithDimensions } from '../services/imageUploadService'
+import { quickValidateImageDimensions } from '../services/idValidationService'
 import { showToast } from './ToastContainer'
 import {
   loadOpenCV,
   detectDocumentInFrame,
-  findDocumentContour,
   cropDocument,
+  cropDocumentFromImage,
   imageToMat,
   matToBase64,
 } from '../services/opencvService'
@@ -63,6 +65,11 @@ export default function Step2EmiratesIDScan({ onComplete, onBack, service }: Ste
   
   // Minimum blur score threshold - very low for easier detection
   const MIN_BLUR_SCORE = isMobile ? 15 : 25
+  // Below this blur score a frame has virtually no edges (covered lens, black
+  // frames while the camera warms up), so the expensive contour search is
+  // skipped. Chosen by hand, not measured: an order of magnitude under
+  // MIN_BLUR_SCORE, so merely soft frames are still searched
+  const MIN_CONTOUR_SEARCH_BLUR_SCORE = 2
   // Stability duration in milliseconds - capture immediately when detected
   const STABILITY_DURATION = 0 // Capture immediately when card is detected
   
@@ -689,7 +696,7 @@ export default function Step2EmiratesIDScan({ onComplete, onBack, service }: Ste
       }
 
       try {
-        const result = await detectDocumentInFrame(videoRef.current)
+        const result = await detectDocumentInFrame(videoRef.current, false, MIN_CONTOUR_SEARCH_BLUR_SCORE)
         
         if (!result) {
           setDetectionReady(false)
@@ -796,7 +803,7 @@ export default function Step2EmiratesIDScan({ onComplete, onBack, service }: Ste
         console.error('Detection error:', error)
       }
     }, 200) // Check every 200ms
-  }, [opencvLoaded, MIN_BLUR_SCORE, STABILITY_DURATION, drawDetection, autoCaptureDocument, currentSide])
+  }, [opencvLoaded, MIN_BLUR_SCORE, MIN_CONTOUR_SEARCH_BLUR_SCORE, STABILITY_DURATION, drawDetection, autoCaptureDocument, currentSide])
 
   const startScan = async (side: 'front' | 'back') => {
     setError(null)
@@ -871,7 +878,7 @@ export default function Step2EmiratesIDScan({ onComplete, onBack, service }: Ste
     // Convert file to base64
     const reader = new FileReader()
     reader.onload = async (e) => {
-      const imageBase64 = e.target?.result as string
+      const uploadedBase64 = e.target?.result as string
       
       setIsProcessing(true)
       setError(null)
@@ -879,34 +886,20 @@ export default function Step2EmiratesIDScan({ onComplete, onBack, service }: Ste
       setProcessingMessage('Detecting and cropping ID card...')
       
       try {
+        // Downscale large phone photos first - detection and backend OCR cost
+        // scale with pixel count, and ID text stays legible well below 4000px
+        const compressed = await compressImageWithDimensions(uploadedBase64).catch(() => null)
+        const imageBase64 = compressed ? compressed.base64 : uploadedBase64
+        
         // Try to detect and crop the document from the uploaded image
         let croppedImage = imageBase64 // Fallback to full image if cropping fails
         
         try {
-          // Convert to OpenCV Mat
-          const img = new Image()
-          img.src = imageBase64
-          await new Promise((resolve, reject) => {
-            img.onload = resolve
-            img.onerror = reject
-            setTimeout(reject, 5000) // 5 second timeout
-          })
-          
-          const videoMat = await imageToMat(img)
-          const points = findDocumentContour(videoMat)
-          
-          if (points && points.length >= 4) {
-            console.log('✅ Document detected in uploaded image, cropping...')
-            const croppedMat = cropDocument(videoMat, points, 800, 500)
-            const croppedBase64 = croppedMat ? matToBase64(croppedMat) : null
-            if (croppedBase64) {
-              croppedImage = croppedBase64
-              console.log('✅ ID card frame cropped successfully from uploaded image')
-            }
-            
-            // Clean up
-            videoMat.delete()
-            if (croppedMat) croppedMat.delete()
+          // Detect and crop the card (cached per image, so re-uploads skip OpenCV work)
+          const croppedBase64 = await cropDocumentFromImage(imageBase64)
+          if (croppedBase64) {
+            croppedImage = croppedBase64
+            console.log('✅ ID card frame cropped successfully from uploaded image')
           } else {
             console.warn('⚠️ Could not detect document in uploaded image, using full image')
           }
@@ -915,6 +908,19 @@ export default function Step2EmiratesIDScan({ onComplete, onBack, service }: Ste
           // Continue with full image as fallback
         }
         
+        // Cheap pre-check for uncropped uploads - skip the backend OCR entirely
+        // for images far too small to contain a legible ID card. The size comes
+        // from the decode already done for compression
+        if (croppedImage === imageBase64 && compressed) {
+          const sizeCheck = quickValidateImageDimensions(compressed.width, compressed.height)
+          if (!sizeCheck.isValid) {
+            setIsProcessing(false)
+            setCurrentSide(null)
+            setError(sizeCheck.reason || 'This does not appear to be an Emirates ID card.')
+            return
+          }
+        }
+        
         // Validate that the image is actually an Emirates ID using backend API
         // Note: OCR process may take 30-60 seconds (DocuPipe needs to upload, process, and extract text)
         setProcessingMessage('Processing Emirates ID... This may take 30-60 seconds.')
@@ -50,6 +50,8 @@ export const API_CONFIG = {
   imageUpload: {
     endpoint: import.meta.env.VITE_IMAGE_UPLOAD_ENDPOINT || '/api/upload',
     maxSize: parseInt(import.meta.env.VITE_MAX_IMAGE_SIZE || '5242880'),
+    // Longest edge (px) uploaded images are downscaled to before detection/OCR
+    maxDimension: parseInt(import.meta.env.VITE_MAX_IMAGE_DIMENSION || '1600'),
   },
   
   // Feature Flags
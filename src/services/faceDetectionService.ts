@@ -33,7 +33,7 @@ async function loadFaceApi() {
 }
 
 let modelsLoaded = false
-let modelsLoading = false
+let modelsLoadPromise: Promise<void> | null = null
 
 export interface FaceDetectionResult {
   detected: boolean
@@ -68,26 +68,51 @@ export interface FaceDetectionResult {
 
 /**
  * Load face-api.js models
+ * Concurrent callers share a single in-flight load instead of polling
  */
 export async function loadFaceModels(): Promise<void> {
   if (modelsLoaded) {
     return Promise.resolve()
   }
 
-  if (modelsLoading) {
-    // Wait for existing load to complete
-    return new Promise((resolve) => {
-      const checkInterval = setInterval(() => {
-        if (modelsLoaded) {
-          clearInterval(checkInterval)
-          resolve()
-        }
-      }, 100)
+  if (!modelsLoadPromise) {
+    modelsLoadPromise = loadFaceModelsOnce().finally(() => {
+      // Cleared so that a failed load can be retried later
+      modelsLoadPromise = null
     })
   }
 
-  modelsLoading = true
+  return modelsLoadPromise
+}
+
+/**
+ * Run the face-api.js models on the GPU (WebGL backend) when available,
+ * falling back to the CPU backend otherwise
+ */
+async function selectTensorflowBackend(): Promise<void> {
+  const tf = faceapi?.tf
+  if (!tf) return
 
+  try {
+    if (tf.getBackend() !== 'webgl' && !(await tf.setBackend('webgl'))) {
+      await tf.setBackend('cpu')
+    }
+    await tf.ready()
+  } catch (error) {
+    console.warn('⚠️ WebGL backend unavailable, using CPU for face detection:', error)
+    try {
+      await tf.setBackend('cpu')
+    } catch (cpuError) {
+      // Backend choice is only an optimization - never let it stop the
+      // models from loading on whatever backend TensorFlow.js defaulted to
+      console.warn('⚠️ Could not switch TensorFlow.js backend, keeping the default:', cpuError)
+    }
+  }
+
+  console.log(`🧠 face-api.js running on ${tf.getBackend()} backend`)
+}
+
+async function loadFaceModelsOnce(): Promise<void> {
   try {
     // Load face-api.js library first
     const faceApiModule = await loadFaceApi()
@@ -98,6 +123,8 @@ export async function loadFaceModels(): Promise<void> {
     // Handle different module export formats
     faceapi = faceApiModule.default || faceApiModule.namespace || faceApiModule
     
+    await selectTensorflowBackend()
+    
     const MODEL_URL = '/models' // Models should be in public/models directory
     const cdnUrl = 'https://cdn.jsdelivr.net/npm/@vladmandic/face-api/model'
     
@@ -125,9 +152,7 @@ export async function loadFaceModels(): Promise<void> {
     }
 
     modelsLoaded = true
-    modelsLoading = false
   } catch (error) {
-    modelsLoading = false
     console.error('❌ Failed to load face-api.js models:', error)
     // Don't throw - allow manual capture as fallback
     console.warn('⚠️ Face auto-detection unavailable. Manual capture still works.')
@@ -1,4 +1,5 @@
 import { API_CONFIG } from '../config/api.config'
+import { base64ToBlob } from '../utils/imageData'
 
 export interface FaceVerificationResult {
   success: boolean
@@ -22,21 +23,6 @@ export interface LivenessDetectionResult {
   error?: string
 }
 
-// Base64 to Blob converter
-function base64ToBlob(base64: string): Blob {
-  const parts = base64.split(',')
-  const contentType = parts[0].match(/:(.*?);/)?.[1] || 'image/jpeg'
-  const raw = atob(parts[1])
-  const rawLength = raw.length
-  const uInt8Array = new Uint8Array(rawLength)
-  
-  for (let i = 0; i < rawLength; ++i) {
-    uInt8Array[i] = raw.charCodeAt(i)
-  }
-  
-  return new Blob([uInt8Array], { type: contentType })
-}
-
 // AWS Rekognition Implementation
 async function verifyWithAWS(
   faceImageBase64: string,
@@ -128,7 +114,7 @@ async function verifyWithAzure(
   try {
     // Step 1: Detect faces in both images
     const detectFace = async (imageBase64: string) => {
-      const blob = base64ToBlob(imageBase64)
+      const blob = await base64ToBlob(imageBase64)
       
       const response = await fetch(
         `${API_CONFIG.face.azure.endpoint}/face/v1.0/detect?returnFaceId=true&returnFaceLandmarks=true`,
@@ -201,7 +187,7 @@ async function verifyWithAzure(
 // Azure Liveness Detection
 async function detectLivenessAzure(faceImageBase64: string): Promise<LivenessDetectionResult> {
   try {
-    const blob = base64ToBlob(faceImageBase64)
+    const blob = await base64ToBlob(faceImageBase64)
     
     const response = await fetch(
       `${API_CONFIG.face.azure.endpoint}/face/v1.0/detect?returnFaceAttributes=accessories,blur,exposure,noise,occlusion`,
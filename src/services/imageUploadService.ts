@@ -1,4 +1,5 @@
 import { API_CONFIG } from '../config/api.config'
+import { base64ToBlob } from '../utils/imageData'
 
 export interface UploadResult {
   success: boolean
@@ -19,7 +20,7 @@ export async function uploadImage(
 ): Promise<UploadResult> {
   try {
     // Convert base64 to blob
-    const blob = base64ToBlob(imageBase64)
+    const blob = await base64ToBlob(imageBase64)
     
     // Create form data
     const formData = new FormData()
@@ -71,47 +72,47 @@ export async function uploadMultipleImages(
   return Promise.all(uploads)
 }
 
-/**
- * Convert base64 to Blob
- */
-function base64ToBlob(base64: string): Blob {
-  const parts = base64.split(',')
-  const contentType = parts[0].match(/:(.*?);/)?.[1] || 'image/jpeg'
-  const raw = atob(parts[1])
-  const rawLength = raw.length
-  const uInt8Array = new Uint8Array(rawLength)
-  
-  for (let i = 0; i < rawLength; ++i) {
-    uInt8Array[i] = raw.charCodeAt(i)
-  }
-  
-  return new Blob([uInt8Array], { type: contentType })
-}
-
 /**
  * Compress image before upload
+ * Downscales so the longest edge is at most maxDimension. Images already
+ * within bounds are returned unchanged to avoid a lossy re-encode.
  * @param base64 Base64 encoded image
- * @param maxWidth Maximum width
+ * @param maxDimension Maximum length of the longest edge
  * @param quality JPEG quality (0-1)
  */
 export async function compressImage(
   base64: string,
-  maxWidth: number = 1920,
+  maxDimension: number = API_CONFIG.imageUpload.maxDimension,
   quality: number = 0.8
 ): Promise<string> {
+  const compressed = await compressImageWithDimensions(base64, maxDimension, quality)
+  return compressed.base64
+}
+
+/**
+ * Same as compressImage, but also returns the pixel dimensions of the result
+ * Callers that need the size get it from the decode done for compression
+ * instead of decoding the image a second time
+ */
+export async function compressImageWithDimensions(
+  base64: string,
+  maxDimension: number = API_CONFIG.imageUpload.maxDimension,
+  quality: number = 0.8
+): Promise<{ base64: string; width: number; height: number }> {
   return new Promise((resolve, reject) => {
     const img = new Image()
     img.onload = () => {
-      const canvas = document.createElement('canvas')
-      let width = img.width
-      let height = img.height
+      const scale = maxDimension / Math.max(img.width, img.height)
+      if (scale >= 1) {
+        resolve({ base64, width: img.width, height: img.height })
+        return
+      }
       
       // Calculate new dimensions
-      if (width > maxWidth) {
-        height = (height * maxWidth) / width
-        width = maxWidth
-      }
+      const width = Math.round(img.width * scale)
+      const height = Math.round(img.height * scale)
       
+      const canvas = document.createElement('canvas')
       canvas.width = width
       canvas.height = height
       
@@ -121,8 +122,10 @@ export async function compressImage(
         return
       }
       
+      // High-quality smoothing averages source pixels when shrinking
+      ctx.imageSmoothingQuality = 'high'
       ctx.drawImage(img, 0, 0, width, height)
-      resolve(canvas.toDataURL('image/jpeg', quality))
+      resolve({ base64: canvas.toDataURL('image/jpeg', quality), width, height })
     }
     
     img.onerror = () => reject(new Error('Failed to load image'))
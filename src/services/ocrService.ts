@@ -1,4 +1,6 @@
 import { API_CONFIG } from '../config/api.config'
+import { LRUCache, hashImage } from '../utils/cache'
+import { base64ToBlob } from '../utils/imageData'
 
 export interface EmiratesIDData {
   idNumber: string
@@ -17,22 +19,6 @@ export interface OCRResult {
   success: boolean
   data?: EmiratesIDData
   error?: string
-  rawResponse?: any
-}
-
-// Base64 to Blob converter
-function base64ToBlob(base64: string): Blob {
-  const parts = base64.split(',')
-  const contentType = parts[0].match(/:(.*?);/)?.[1] || 'image/jpeg'
-  const raw = atob(parts[1])
-  const rawLength = raw.length
-  const uInt8Array = new Uint8Array(rawLength)
-  
-  for (let i = 0; i < rawLength; ++i) {
-    uInt8Array[i] = raw.charCodeAt(i)
-  }
-  
-  return new Blob([uInt8Array], { type: contentType })
 }
 
 // AWS Textract Implementation
@@ -63,7 +49,6 @@ async function processWithAWS(imageBase64: string, side: 'front' | 'back'): Prom
     return {
       success: true,
       data: result.data,
-      rawResponse: result.rawResponse,
     }
   } catch (error) {
     console.error('AWS OCR error:', error)
@@ -77,7 +62,7 @@ async function processWithAWS(imageBase64: string, side: 'front' | 'back'): Prom
 // Azure Computer Vision Implementation
 async function processWithAzure(imageBase64: string, side: 'front' | 'back'): Promise<OCRResult> {
   try {
-    const blob = base64ToBlob(imageBase64)
+    const blob = await base64ToBlob(imageBase64)
     
     const response = await fetch(
       `${API_CONFIG.ocr.azure.endpoint}/vision/v3.2/read/analyze`,
@@ -132,7 +117,6 @@ async function processWithAzure(imageBase64: string, side: 'front' | 'back'): Pr
     return {
       success: true,
       data: extractedData,
-      rawResponse: result,
     }
   } catch (error) {
     console.error('Azure OCR error:', error)
@@ -192,7 +176,6 @@ async function processWithGoogle(imageBase64: string, side: 'front' | 'back'): P
     return {
       success: true,
       data: extractedData,
-      rawResponse: result,
     }
   } catch (error) {
     console.error('Google Vision error:', error)
@@ -206,7 +189,7 @@ async function processWithGoogle(imageBase64: string, side: 'front' | 'back'): P
 // Mindee API Implementation (Specialized for ID documents)
 async function processWithMindee(imageBase64: string, _side: 'front' | 'back'): Promise<OCRResult> {
   try {
-    const blob = base64ToBlob(imageBase64)
+    const blob = await base64ToBlob(imageBase64)
     const formData = new FormData()
     formData.append('document', blob, 'emirates-id.jpg')
     
@@ -243,7 +226,6 @@ async function processWithMindee(imageBase64: string, _side: 'front' | 'back'):
     return {
       success: true,
       data: extractedData,
-      rawResponse: result,
     }
   } catch (error) {
     console.error('Mindee API error:', error)
@@ -254,25 +236,58 @@ async function processWithMindee(imageBase64: string, _side: 'front' | 'back'):
   }
 }
 
+// Emirates ID patterns - compiled once at module load rather than per call
+const ID_NUMBER_PATTERN = /784-\d{4}-\d{7}-\d{1}/
+// Layout of a full ID number (784-XXXX-XXXXXXX-X) for the exact-format check
+const ID_NUMBER_LENGTH = 18
+// Dates, optionally preceded by a birth / expiry / issue label - one scan
+// both finds and classifies them (label alternatives are tried first, so a
+// labelled date is matched from its label)
+const LABELLED_DATE_PATTERN = /(?:(birth|dob|born)|(expiry|exp|valid)|(issued|issue))[^\d]{0,20}(\d{1,2}[\/\-]\d{1,2}[\/\-]\d{4})|(\d{1,2}[\/\-]\d{1,2}[\/\-]\d{4})/g
+// A single numeric date (d/m/yyyy or yyyy-m-d, any of / - . as separator)
+const ID_DATE_PATTERN = /^(\d{1,4})([\/\-.])(\d{1,2})\2(\d{1,4})$/
+// Only digits and date separators - anything like this that isn't a
+// well-formed date is garbage, not a format the native parser knows
+const NUMERIC_DATE_CHARS_PATTERN = /^[\d\/\-.]+$/
+
 // Parse Emirates ID data from OCR text
 function parseEmiratesIDFromText(textData: any, _side: 'front' | 'back'): EmiratesIDData {
   // This is a simplified parser - enhance based on actual Emirates ID format
   const allText = JSON.stringify(textData).toLowerCase()
   
   // Extract patterns for Emirates ID
-  const idNumberPattern = /784-\d{4}-\d{7}-\d{1}/
-  const datePattern = /\d{1,2}[\/\-]\d{1,2}[\/\-]\d{4}/g
+  const idNumberMatch = allText.match(ID_NUMBER_PATTERN)
   
-  const idNumberMatch = allText.match(idNumberPattern)
-  const dates = allText.match(datePattern) || []
+  let dateOfBirth = ''
+  let expiryDate = ''
+  let issueDate = ''
+  const unlabelledDates: string[] = []
+  
+  for (const match of allText.matchAll(LABELLED_DATE_PATTERN)) {
+    const [, birthLabel, expiryLabel, issueLabel, labelledDate, plainDate] = match
+    if (birthLabel && !dateOfBirth) {
+      dateOfBirth = labelledDate
+    } else if (expiryLabel && !expiryDate) {
+      expiryDate = labelledDate
+    } else if (issueLabel && !issueDate) {
+      issueDate = labelledDate
+    } else {
+      unlabelledDates.push(labelledDate || plainDate)
+    }
+  }
+  
+  // Unlabelled dates fall back to card order: date of birth, then expiry
+  if (!dateOfBirth) dateOfBirth = unlabelledDates.shift() || ''
+  if (!expiryDate) expiryDate = unlabelledDates.shift() || ''
   
   return {
     idNumber: idNumberMatch ? idNumberMatch[0] : '',
     name: '', // Would need more sophisticated parsing
     nationality: '',
-    dateOfBirth: dates[0] || '',
+    dateOfBirth,
     gender: '',
-    expiryDate: dates[1] || '',
+    expiryDate,
+    issueDate: issueDate || undefined,
     confidence: 0.85,
   }
 }
@@ -342,21 +357,72 @@ export async function processEmiratesID(
   }
 }
 
-// Validate Emirates ID format
+// Validate Emirates ID format (784-XXXX-XXXXXXX-X). The shape is fixed,
+// so a direct character scan is enough - no regex needed
 export function validateEmiratesIDFormat(idNumber: string): boolean {
-  const pattern = /^784-\d{4}-\d{7}-\d{1}$/
-  return pattern.test(idNumber)
+  // OCR data comes from untyped provider/backend JSON - anything that isn't
+  // a string (null, undefined, numbers) is simply not a valid ID
+  if (typeof idNumber !== 'string' || idNumber.length !== ID_NUMBER_LENGTH || !idNumber.startsWith('784')) {
+    return false
+  }
+
+  for (let i = 3; i < ID_NUMBER_LENGTH; i++) {
+    const code = idNumber.charCodeAt(i)
+    const expectDash = i === 3 || i === 8 || i === 16
+    if (expectDash ? code !== 45 /* '-' */ : code < 48 || code > 57 /* '0'-'9' */) {
+      return false
+    }
+  }
+  return true
 }
 
-// Check if Emirates ID is expired
-export function isEmiratesIDExpired(expiryDate: string): boolean {
-  try {
-    const expiry = new Date(expiryDate)
-    const today = new Date()
-    return expiry < today
-  } catch {
+// Parse an ID card date. One match captures the digit groups; a 4-digit
+// first group means year-first (yyyy-mm-dd), otherwise it is day-first
+// (dd/mm/yyyy, as printed on the card). The date is built from the parts
+// directly instead of relying on Date's locale-dependent string parsing.
+// Non-numeric shapes fall back to the native parser. Returns an
+// epoch-millisecond timestamp, since callers only compare dates.
+function parseIDDateTime(dateStr: string): number | null {
+  const value = dateStr.trim()
+  if (!value) {
+    return null
+  }
+
+  const match = ID_DATE_PATTERN.exec(value)
+  if (!match) {
+    // Skip the native parser for mangled numeric dates (e.g. OCR output
+    // like '12/2025/01') - it would either reject them or guess wrongly
+    if (NUMERIC_DATE_CHARS_PATTERN.test(value)) {
+      return null
+    }
+    const parsed = new Date(value).getTime()
+    return isNaN(parsed) ? null : parsed
+  }
+
+  const [, first, , middle, last] = match
+  const yearFirst = first.length === 4
+  const year = Number(yearFirst ? first : last)
+  const month = Number(middle)
+  const day = Number(yearFirst ? last : first)
+
+  const date = new Date(year, month - 1, day)
+  // Reject out-of-range parts (e.g. 31/02/2025) that Date would roll over,
+  // and short years that Date would map into the 1900s
+  if (date.getFullYear() !== year || date.getMonth() !== month - 1 || date.getDate() !== day) {
+    return null
+  }
+  return date.getTime()
+}
+
+// Check if Emirates ID is expired. Callers checking several dates in one
+// validation can pass a single "now" (epoch ms) rather than reading the
+// clock each time
+export function isEmiratesIDExpired(expiryDate: string, now: number = Date.now()): boolean {
+  const expiry = parseIDDateTime(expiryDate)
+  if (expiry === null) {
     return false
   }
+  return expiry < now
 }
 
 // Backend OCR API Response Types
@@ -378,6 +444,15 @@ export interface BackendOCRResponse {
   error?: string
 }
 
+// Backend OCR responses keyed by image hash - retries and re-uploads of the
+// same image skip the 30-60 second OCR round-trip
+const BACKEND_OCR_CACHE_SIZE = 32
+const backendOCRCache = new LRUCache<string, BackendOCRResponse>(BACKEND_OCR_CACHE_SIZE)
+
+// In-flight backend OCR requests keyed by image hash, so concurrent calls for
+// the same image (e.g. auto-capture racing a manual upload) share one request
+const pendingBackendOCR = new Map<string, Promise<BackendOCRResponse>>()
+
 /**
  * Call backend OCR API endpoint to validate Emirates ID
  * This replaces frontend validation - backend handles all validation logic
@@ -385,6 +460,35 @@ export interface BackendOCRResponse {
  */
 export async function validateEmiratesIDWithBackend(
   imageBase64: string
+): Promise<BackendOCRResponse> {
+  const cacheKey = await hashImage(imageBase64)
+  if (!cacheKey) {
+    return requestBackendOCR(imageBase64, null)
+  }
+  
+  const cachedResult = backendOCRCache.get(cacheKey)
+  if (cachedResult) {
+    console.log('♻️ Using cached backend OCR response for identical image')
+    return cachedResult
+  }
+  
+  const pendingRequest = pendingBackendOCR.get(cacheKey)
+  if (pendingRequest) {
+    console.log('⏳ Joining in-flight backend OCR request for identical image')
+    return pendingRequest
+  }
+  
+  const request = requestBackendOCR(imageBase64, cacheKey).finally(() => {
+    pendingBackendOCR.delete(cacheKey)
+  })
+  pendingBackendOCR.set(cacheKey, request)
+  return request
+}
+
+// Send one OCR request to the backend and cache confirmed Emirates ID reads
+async function requestBackendOCR(
+  imageBase64: string,
+  cacheKey: string | null
 ): Promise<BackendOCRResponse> {
   const apiUrl = `${API_CONFIG.baseUrl}/api/ocr`
   
@@ -425,7 +529,24 @@ export async function validateEmiratesIDWithBackend(
     }
 
     const result: BackendOCRResponse = await response.json()
-    console.log('✅ Backend OCR API response:', result)
+    // The response carries the full OCR'd ID text (name, ID number, DOB) -
+    // only dump it in development builds
+    if (import.meta.env.DEV) {
+      console.log('✅ Backend OCR API response:', result)
+    } else {
+      console.log('✅ Backend OCR API response:', {
+        success: result.success,
+        isEmiratesID: result.isEmiratesID,
+        side: result.side,
+      })
+    }
+    
+    // Only cache confirmed Emirates ID reads. Rejections and undetermined
+    // sides make the user retry, and a retry with the same file must reach
+    // the backend again in case the first read was a misread
+    if (cacheKey && result.success && result.isEmiratesID && result.side !== 'unknown') {
+      backendOCRCache.set(cacheKey, result)
+    }
     
     return result
   } catch (error) {
@@ -3,6 +3,8 @@
  * Handles automatic detection of rectangular documents (ID cards)
  */
 
+import { LRUCache, hashImage } from '../utils/cache';
+
 declare global {
   interface Window {
     cv: any;
@@ -10,35 +12,38 @@ declare global {
 }
 
 let opencvReady = false;
-let opencvLoading = false;
+let opencvLoadPromise: Promise<void> | null = null;
+
+// Compiled once at module load - device checks run on every detection frame
+const MOBILE_USER_AGENT_PATTERN = /iPhone|iPad|iPod|Android/i;
 
 /**
  * Load OpenCV.js from CDN
+ * Concurrent callers share a single in-flight load instead of polling
  */
 export async function loadOpenCV(): Promise<void> {
   if (opencvReady) {
     return Promise.resolve();
   }
 
-  if (opencvLoading) {
-    // Wait for existing load to complete
-    return new Promise((resolve) => {
-      const checkInterval = setInterval(() => {
-        if (opencvReady) {
-          clearInterval(checkInterval);
-          resolve();
-        }
-      }, 100);
+  if (!opencvLoadPromise) {
+    opencvLoadPromise = loadOpenCVScript().finally(() => {
+      // Cleared so that a failed load can be retried later
+      opencvLoadPromise = null;
     });
   }
 
-  opencvLoading = true;
+  return opencvLoadPromise;
+}
 
+/**
+ * Inject the OpenCV.js script and resolve once the runtime is initialized
+ */
+function loadOpenCVScript(): Promise<void> {
   return new Promise((resolve, reject) => {
     // Check if OpenCV is already loaded
     if (window.cv && window.cv.Mat) {
       opencvReady = true;
-      opencvLoading = false;
       resolve();
       return;
     }
@@ -49,7 +54,6 @@ export async function loadOpenCV(): Promise<void> {
       (window as any).cv = {
         onRuntimeInitialized: () => {
           opencvReady = true;
-          opencvLoading = false;
           console.log('✅ OpenCV.js loaded and initialized successfully');
           resolve();
         }
@@ -58,7 +62,6 @@ export async function loadOpenCV(): Promise<void> {
       // If cv already exists, set the callback
       window.cv['onRuntimeInitialized'] = () => {
         opencvReady = true;
-        opencvLoading = false;
         console.log('✅ OpenCV.js loaded and initialized successfully');
         resolve();
       };
@@ -77,7 +80,6 @@ export async function loadOpenCV(): Promise<void> {
 
     const loadFromSource = (index: number) => {
       if (index >= cdnSources.length) {
-        opencvLoading = false;
         const errorMsg = 'OpenCV.js could not be loaded. Automatic ID detection is disabled. You can still upload images manually.';
         console.error(errorMsg);
         reject(new Error(errorMsg));
@@ -97,7 +99,6 @@ export async function loadOpenCV(): Promise<void> {
         if (window.cv && window.cv.Mat) {
           clearInterval(checkInterval);
           opencvReady = true;
-          opencvLoading = false;
           console.log(`✅ OpenCV.js loaded from source ${index + 1}`);
           resolve();
           return;
@@ -136,10 +137,12 @@ export async function loadOpenCV(): Promise<void> {
 /**
  * Calculate blur using Variance of Laplacian
  * Returns a blur score - higher values indicate sharper images
+ * Returns -1 when the score could not be computed, so callers can tell a
+ * failure apart from a genuinely featureless (score 0) frame
  */
 export function calculateBlurScore(src: any): number {
   if (!window.cv || !window.cv.Mat) {
-    return 0;
+    return -1;
   }
 
   try {
@@ -157,7 +160,8 @@ export function calculateBlurScore(src: any): number {
         window.cv.cvtColor(src, gray, window.cv.COLOR_RGB2GRAY);
       }
     } else {
-      gray = src.clone();
+      // Already grayscale - read it in place rather than cloning
+      gray = src;
     }
 
     // Apply Laplacian filter
@@ -168,7 +172,9 @@ export function calculateBlurScore(src: any): number {
     const variance = stddev.data64F[0] * stddev.data64F[0];
 
     // Cleanup
-    gray.delete();
+    if (gray !== src) {
+      gray.delete();
+    }
     laplacian.delete();
     mean.delete();
     stddev.delete();
@@ -176,20 +182,37 @@ export function calculateBlurScore(src: any): number {
     return variance;
   } catch (error) {
     console.error('Error calculating blur score:', error);
-    return 0;
+    return -1;
   }
 }
 
+/**
+ * Calculate the bounding rectangle size of a set of points in a single pass
+ * (no intermediate coordinate arrays or spread Math.min/max calls)
+ */
+function calculateBoundingBox(points: any[]): { width: number; height: number } {
+  let minX = Infinity;
+  let maxX = -Infinity;
+  let minY = Infinity;
+  let maxY = -Infinity;
+
+  for (const p of points) {
+    if (p.x < minX) minX = p.x;
+    if (p.x > maxX) maxX = p.x;
+    if (p.y < minY) minY = p.y;
+    if (p.y > maxY) maxY = p.y;
+  }
+
+  return { width: maxX - minX, height: maxY - minY };
+}
+
 /**
  * Calculate aspect ratio of a bounding rectangle
  */
 function calculateAspectRatio(points: any[]): number {
   if (points.length < 4) return 0;
   
-  const xs = points.map(p => p.x);
-  const ys = points.map(p => p.y);
-  const width = Math.max(...xs) - Math.min(...xs);
-  const height = Math.max(...ys) - Math.min(...ys);
+  const { width, height } = calculateBoundingBox(points);
   
   if (height === 0) return 0;
   return width / height;
@@ -201,10 +224,7 @@ function calculateAspectRatio(points: any[]): number {
 function calculateBoundingArea(points: any[]): number {
   if (points.length < 4) return 0;
   
-  const xs = points.map(p => p.x);
-  const ys = points.map(p => p.y);
-  const width = Math.max(...xs) - Math.min(...xs);
-  const height = Math.max(...ys) - Math.min(...ys);
+  const { width, height } = calculateBoundingBox(points);
   
   return width * height;
 }
@@ -217,8 +237,10 @@ function calculateBoundingArea(points: any[]): number {
 function isValidIDCardShape(points: any[], imageWidth: number, imageHeight: number): boolean {
   if (points.length < 4) return false;
   
-  const aspectRatio = calculateAspectRatio(points);
-  const boundingArea = calculateBoundingArea(points);
+  // Single bounding-box pass shared by the ratio, area and size checks
+  const { width, height } = calculateBoundingBox(points);
+  const aspectRatio = height === 0 ? 0 : width / height;
+  const boundingArea = width * height;
   const imageArea = imageWidth * imageHeight;
   
   // Aspect ratio check - ID cards are roughly 1.586:1 (width:height)
@@ -246,10 +268,6 @@ function isValidIDCardShape(points: any[], imageWidth: number, imageHeight: numb
   // Cards are typically at least 100x60 pixels when detected
   const minWidth = 100;
   const minHeight = 60;
-  const xs = points.map(p => p.x);
-  const ys = points.map(p => p.y);
-  const width = Math.max(...xs) - Math.min(...xs);
-  const height = Math.max(...ys) - Math.min(...ys);
   
   if (width < minWidth || height < minHeight) {
     return false;
@@ -267,51 +285,55 @@ export function findDocumentContour(src: any): any[] | null {
     return null;
   }
 
+  // Bound once - the pipeline and contour loop below make dozens of cv calls
+  const cv = window.cv;
+
   try {
     let gray: any;
-    const blur = new window.cv.Mat();
-    const edges = new window.cv.Mat();
-    const hierarchy = new window.cv.Mat();
-    const contours = new window.cv.MatVector();
+    const blur = new cv.Mat();
+    const edges = new cv.Mat();
+    const hierarchy = new cv.Mat();
+    const contours = new cv.MatVector();
 
     // Convert to grayscale
     if (src.channels() === 3 || src.channels() === 4) {
-      gray = new window.cv.Mat();
+      gray = new cv.Mat();
       if (src.channels() === 4) {
-        window.cv.cvtColor(src, gray, window.cv.COLOR_RGBA2GRAY);
+        cv.cvtColor(src, gray, cv.COLOR_RGBA2GRAY);
       } else {
-        window.cv.cvtColor(src, gray, window.cv.COLOR_RGB2GRAY);
+        cv.cvtColor(src, gray, cv.COLOR_RGB2GRAY);
       }
     } else {
-      gray = src.clone();
+      // Already grayscale - read it in place rather than cloning
+      gray = src;
     }
 
     const imageWidth = src.cols;
     const imageHeight = src.rows;
 
     // Detect if device is mobile for adaptive parameters
-    const isMobile = /iPhone|iPad|iPod|Android/i.test(navigator.userAgent) || window.innerWidth < 768;
+    const isMobile = MOBILE_USER_AGENT_PATTERN.test(navigator.userAgent) || window.innerWidth < 768;
     
     // Apply contrast enhancement for better edge detection on similar-colored backgrounds
-    const enhanced = new window.cv.Mat();
-    window.cv.convertScaleAbs(gray, enhanced, 1.5, 30); // Increase contrast and brightness
+    const enhanced = new cv.Mat();
+    cv.convertScaleAbs(gray, enhanced, 1.5, 30); // Increase contrast and brightness
     
     // Apply histogram equalization to improve contrast
-    const equalized = new window.cv.Mat();
-    window.cv.equalizeHist(enhanced, equalized);
+    const equalized = new cv.Mat();
+    cv.equalizeHist(enhanced, equalized);
     
     // Apply Gaussian blur to reduce noise - slightly more blur for mobile
     const blurSize = isMobile ? 7 : 5;
-    window.cv.GaussianBlur(equalized, blur, new window.cv.Size(blurSize, blurSize), 0);
+    cv.GaussianBlur(equalized, blur, new cv.Size(blurSize, blurSize), 0);
 
     // Try adaptive thresholding first for low-contrast scenarios
-    const adaptive = new window.cv.Mat();
-    window.cv.adaptiveThreshold(
+    const adaptive = new cv.Mat();
+    cv.adaptiveThreshold(
       blur,
       adaptive,
       255,
-      window.cv.ADAPTIVE_THRESH_GAUSSIAN_C,
-      window.cv.THRESH_BINARY,
+      cv.ADAPTIVE_THRESH_GAUSSIAN_C,
+      cv.THRESH_BINARY,
       11,
       2
     );
@@ -320,11 +342,11 @@ export function findDocumentContour(src: any): any[] | null {
     // Use lower thresholds to detect edges even on similar-colored backgrounds
     const cannyLow = isMobile ? 10 : 15;
     const cannyHigh = isMobile ? 40 : 50;
-    window.cv.Canny(blur, edges, cannyLow, cannyHigh);
+    cv.Canny(blur, edges, cannyLow, cannyHigh);
     
     // Combine adaptive threshold and Canny edges for better detection
-    const combined = new window.cv.Mat();
-    window.cv.bitwise_or(edges, adaptive, combined);
+    const combined = new cv.Mat();
+    cv.bitwise_or(edges, adaptive, combined);
     
     // Cleanup intermediate mats
     enhanced.delete();
@@ -333,54 +355,59 @@ export function findDocumentContour(src: any): any[] | null {
 
     // Apply morphological operations to close gaps in card edges
     // Use larger kernel for better edge connection on low-contrast images
-    const kernel = window.cv.getStructuringElement(window.cv.MORPH_RECT, new window.cv.Size(5, 5));
-    const closed = new window.cv.Mat();
-    window.cv.morphologyEx(combined, closed, window.cv.MORPH_CLOSE, kernel);
+    const kernel = cv.getStructuringElement(cv.MORPH_RECT, new cv.Size(5, 5));
+    const closed = new cv.Mat();
+    cv.morphologyEx(combined, closed, cv.MORPH_CLOSE, kernel);
     
     // Additional dilation to strengthen weak edges
-    const dilated = new window.cv.Mat();
-    const dilateKernel = window.cv.getStructuringElement(window.cv.MORPH_RECT, new window.cv.Size(3, 3));
-    window.cv.dilate(closed, dilated, dilateKernel);
+    const dilated = new cv.Mat();
+    const dilateKernel = cv.getStructuringElement(cv.MORPH_RECT, new cv.Size(3, 3));
+    cv.dilate(closed, dilated, dilateKernel);
     
     kernel.delete();
     dilateKernel.delete();
     combined.delete();
 
     // Find contours
-    window.cv.findContours(
+    cv.findContours(
       dilated,
       contours,
       hierarchy,
-      window.cv.RETR_EXTERNAL,
-      window.cv.CHAIN_APPROX_SIMPLE
+      cv.RETR_EXTERNAL,
+      cv.CHAIN_APPROX_SIMPLE
     );
 
     let bestContour: any = null;
     let bestScore = 0;
 
+    // Loop-invariant thresholds, computed once rather than per contour
+    // Minimum area threshold - much lower for easier detection, especially for cards held by hand
+    const minArea = isMobile ? 1500 : 2000;
+    // Higher epsilon factor allows for less precise edges (when fingers cover parts)
+    const epsilonFactor = isMobile ? 0.05 : 0.045;
+    // 4-12 corners acceptable - fingers/hand might create additional edge points
+    const minCorners = 4;
+    const maxCorners = 12;
+    const idealAspectRatio = 1.586;
+    const imageArea = imageWidth * imageHeight;
+    const contourCount = contours.size();
+
     // Find the best ID card-shaped contour
-    for (let i = 0; i < contours.size(); i++) {
+    for (let i = 0; i < contourCount; i++) {
       const contour = contours.get(i);
-      const area = window.cv.contourArea(contour);
+      const area = cv.contourArea(contour);
 
-      // Minimum area threshold - much lower for easier detection, especially for cards held by hand
-      const minArea = isMobile ? 1500 : 2000;
       if (area < minArea) {
         contour.delete();
         continue;
       }
 
       // Approximate contour to polygon - more lenient for cards held by hand
-      // Higher epsilon factor allows for less precise edges (when fingers cover parts)
-      const epsilonFactor = isMobile ? 0.05 : 0.045;
-      const epsilon = epsilonFactor * window.cv.arcLength(contour, true);
-      const approx = new window.cv.Mat();
-      window.cv.approxPolyDP(contour, approx, epsilon, true);
+      const epsilon = epsilonFactor * cv.arcLength(contour, true);
+      const approx = new cv.Mat();
+      cv.approxPolyDP(contour, approx, epsilon, true);
 
       // Check if it's roughly rectangular (4-12 corners acceptable for cards held by hand)
-      // More corners allowed because fingers/hand might create additional edge points
-      const minCorners = 4;
-      const maxCorners = 12;
       if (approx.rows < minCorners || approx.rows > maxCorners) {
         approx.delete();
         contour.delete();
@@ -401,9 +428,7 @@ export function findDocumentContour(src: any): any[] | null {
         // Score based on area and aspect ratio match (closer to 1.586 is better)
         // Prefer larger cards (close-up) - up to 70% of image area
         const aspectRatio = calculateAspectRatio(points);
-        const idealAspectRatio = 1.586;
         const aspectRatioScore = 1 - Math.abs(aspectRatio - idealAspectRatio) / idealAspectRatio;
-        const imageArea = imageWidth * imageHeight;
         const areaRatio = area / imageArea;
         // Prefer larger cards (close-up) - give higher score to cards that take up more space
         const areaScore = Math.min(areaRatio / 0.7, 1); // Prefer cards up to 70% of image (close-up)
@@ -427,7 +452,9 @@ export function findDocumentContour(src: any): any[] | null {
     }
 
     // Cleanup
-    gray.delete();
+    if (gray !== src) {
+      gray.delete();
+    }
     blur.delete();
     edges.delete();
     closed.delete();
@@ -468,10 +495,16 @@ export function orderPoints(points: any[]): any[] {
     return points;
   }
 
-  // Calculate center
+  // Calculate center (both coordinate sums in one pass)
+  let sumX = 0;
+  let sumY = 0;
+  for (const p of points) {
+    sumX += p.x;
+    sumY += p.y;
+  }
   const center = {
-    x: points.reduce((sum, p) => sum + p.x, 0) / points.length,
-    y: points.reduce((sum, p) => sum + p.y, 0) / points.length,
+    x: sumX / points.length,
+    y: sumY / points.length,
   };
 
   // Sort points by angle from center
@@ -580,10 +613,9 @@ export function matToBase64(mat: any, format: string = 'image/jpeg'): string | n
         window.cv.cvtColor(mat, rgbaMat, window.cv.COLOR_RGB2RGBA);
       }
 
-      // Create ImageData
+      // Create ImageData - copy the Mat's pixels straight into the canvas buffer
       const imageData = ctx.createImageData(mat.cols, mat.rows);
-      const data = new Uint8ClampedArray(rgbaMat.data);
-      imageData.data.set(data);
+      imageData.data.set(rgbaMat.data);
 
       ctx.putImageData(imageData, 0, 0);
       
@@ -610,6 +642,30 @@ export function matToBase64(mat: any, format: string = 'image/jpeg'): string | n
   }
 }
 
+/**
+ * Decode a base64 / URL image source
+ * Uses createImageBitmap where supported so decoding happens off the main
+ * thread and the detection UI stays responsive; falls back to an <img> element
+ */
+async function decodeImageSource(imageSrc: string): Promise<HTMLImageElement | ImageBitmap> {
+  if (typeof createImageBitmap === 'function') {
+    try {
+      const response = await fetch(imageSrc);
+      return await createImageBitmap(await response.blob(), { imageOrientation: 'from-image' });
+    } catch (error) {
+      console.warn('createImageBitmap decode failed, falling back to <img>:', error);
+    }
+  }
+
+  const img = new Image();
+  await new Promise((resolve, reject) => {
+    img.onload = resolve;
+    img.onerror = reject;
+    img.src = imageSrc;
+  });
+  return img;
+}
+
 /**
  * Convert image element or base64 to OpenCV Mat
  */
@@ -619,16 +675,11 @@ export async function imageToMat(imageSrc: string | HTMLImageElement | HTMLVideo
   }
 
   try {
-    let img: HTMLImageElement | HTMLVideoElement;
+    let img: HTMLImageElement | HTMLVideoElement | ImageBitmap;
 
     if (typeof imageSrc === 'string') {
       // Base64 or URL
-      img = new Image();
-      await new Promise((resolve, reject) => {
-        img.onload = resolve;
-        img.onerror = reject;
-        img.src = imageSrc;
-      });
+      img = await decodeImageSource(imageSrc);
     } else {
       img = imageSrc;
     }
@@ -646,6 +697,11 @@ export async function imageToMat(imageSrc: string | HTMLImageElement | HTMLVideo
     ctx.drawImage(img, 0, 0);
     const imageData = ctx.getImageData(0, 0, canvas.width, canvas.height);
 
+    // Release decoded bitmaps eagerly rather than waiting for GC
+    if (typeof ImageBitmap !== 'undefined' && img instanceof ImageBitmap) {
+      img.close();
+    }
+
     // Create OpenCV Mat from image data
     const mat = window.cv.matFromImageData(imageData);
     return mat;
@@ -668,7 +724,7 @@ export function calculateGuideFrameROI(
   }
 
   // Guide frame dimensions match the UI frame (centered, ID card aspect ratio)
-  const isMobile = /iPhone|iPad|iPod|Android/i.test(navigator.userAgent) || window.innerWidth < 768;
+  const isMobile = MOBILE_USER_AGENT_PATTERN.test(navigator.userAgent) || window.innerWidth < 768;
   const isSmallScreen = window.innerWidth >= 640 && window.innerWidth < 768; // sm breakpoint
   const isMediumScreen = window.innerWidth >= 768; // md breakpoint
 
@@ -726,7 +782,8 @@ export function calculateGuideFrameROI(
  */
 export async function detectDocumentInFrame(
   videoElement: HTMLVideoElement,
-  useROI: boolean = false // Detect across entire frame by default for close-up cards
+  useROI: boolean = false, // Detect across entire frame by default for close-up cards
+  minContourSearchBlurScore: number = 0 // Skip the contour search below this blur score
 ): Promise<{
   detected: boolean;
   points: any[] | null;
@@ -780,8 +837,12 @@ export async function detectDocumentInFrame(
       }
     }
 
+    // Cheap quality check first - only search for contours when the frame has
+    // edges. If the score could not be computed (-1), search anyway rather
+    // than silently turning detection off
     const blurScore = calculateBlurScore(mat);
-    const points = findDocumentContour(mat);
+    const skipContourSearch = blurScore >= 0 && blurScore < minContourSearchBlurScore;
+    const points = skipContourSearch ? null : findDocumentContour(mat);
 
     // Adjust points back to full video coordinates if ROI was used
     let adjustedPoints = points;
@@ -815,3 +876,47 @@ export async function detectDocumentInFrame(
   }
 }
 
+// Cropped uploads keyed by source image hash, so re-uploading the same photo
+// skips contour detection and perspective warping. Only successful crops are
+// stored - a miss may be a transient OpenCV failure, and detection thresholds
+// depend on the viewport, so it must be retried on the next upload
+const CROPPED_UPLOAD_CACHE_SIZE = 8;
+const croppedUploadCache = new LRUCache<string, string>(CROPPED_UPLOAD_CACHE_SIZE);
+
+/**
+ * Detect the ID card in an uploaded image and crop it to the card frame
+ * Returns the cropped base64 image, or null if no document was detected
+ */
+export async function cropDocumentFromImage(imageBase64: string): Promise<string | null> {
+  const cacheKey = await hashImage(imageBase64);
+  const cachedCrop = cacheKey ? croppedUploadCache.get(cacheKey) : undefined;
+  if (cachedCrop) {
+    return cachedCrop;
+  }
+
+  const mat = await imageToMat(imageBase64);
+  if (!mat) {
+    // OpenCV not ready or image failed to load - allow a retry
+    return null;
+  }
+
+  let croppedBase64: string | null = null;
+  try {
+    const points = findDocumentContour(mat);
+    if (points && points.length >= 4) {
+      console.log('✅ Document detected in uploaded image, cropping...');
+      const croppedMat = cropDocument(mat, points, 800, 500);
+      if (croppedMat) {
+        croppedBase64 = matToBase64(croppedMat);
+        croppedMat.delete();
+      }
+    }
+  } finally {
+    mat.delete();
+  }
+
+  if (cacheKey && croppedBase64) {
+    croppedUploadCache.set(cacheKey, croppedBase64);
+  }
+  return croppedBase64;
+}
@@ -3,6 +3,8 @@
  * For Emirates ID validation and face verification
  */
 
+import { base64ToBlob } from '../utils/imageData'
+
 // Use backend proxy instead of calling TRUE-ID directly (solves CORS issues)
 const BACKEND_API_URL = import.meta.env.VITE_API_BASE_URL || 'http://localhost:5000'
 
@@ -19,23 +21,6 @@ export interface TrueIDResponse {
   error?: string
 }
 
-/**
- * Convert base64 image to Blob
- */
-function base64ToBlob(base64: string, mimeType: string = 'image/jpeg'): Blob {
-  const parts = base64.split(',')
-  const contentType = parts[0].match(/:(.*?);/)?.[1] || mimeType
-  const raw = atob(parts[1])
-  const rawLength = raw.length
-  const uInt8Array = new Uint8Array(rawLength)
-  
-  for (let i = 0; i < rawLength; ++i) {
-    uInt8Array[i] = raw.charCodeAt(i)
-  }
-  
-  return new Blob([uInt8Array], { type: contentType })
-}
-
 /**
  * Validate Emirates ID and person photo using TRUE-ID API
  * @param idFrontBase64 Base64 encoded front of Emirates ID
@@ -53,15 +38,17 @@ export async function validateWithTrueID(
     // Create FormData
     const formData = new FormData()
     
-    // Convert base64 to blobs and append to form
-    const idFrontBlob = base64ToBlob(idFrontBase64)
-    const personBlob = base64ToBlob(personPhotoBase64)
+    // Convert base64 to blobs (decoded concurrently) and append to form
+    const [idFrontBlob, personBlob, idBackBlob] = await Promise.all([
+      base64ToBlob(idFrontBase64),
+      base64ToBlob(personPhotoBase64),
+      idBackBase64 ? base64ToBlob(idBackBase64) : null,
+    ])
     
     formData.append('id_front', idFrontBlob, 'id_front.jpg')
     formData.append('person', personBlob, 'person.jpg')
     
-    if (idBackBase64) {
-      const idBackBlob = base64ToBlob(idBackBase64)
+    if (idBackBlob) {
       formData.append('id_back', idBackBlob, 'id_back.jpg')
     }
     
@@ -0,0 +1,56 @@
+/**
+ * Client-side caching utilities
+ */
+
+/**
+ * Small least-recently-used cache backed by Map insertion order
+ */
+export class LRUCache<K, V> {
+  private entries = new Map<K, V>()
+
+  constructor(private maxSize: number) {}
+
+  has(key: K): boolean {
+    return this.entries.has(key)
+  }
+
+  get(key: K): V | undefined {
+    if (!this.entries.has(key)) {
+      return undefined
+    }
+
+    // Re-insert to mark as most recently used
+    const value = this.entries.get(key) as V
+    this.entries.delete(key)
+    this.entries.set(key, value)
+    return value
+  }
+
+  set(key: K, value: V): void {
+    this.entries.delete(key)
+    this.entries.set(key, value)
+
+    if (this.entries.size > this.maxSize) {
+      // Map iterates in insertion order, so the first key is the oldest
+      this.entries.delete(this.entries.keys().next().value as K)
+    }
+  }
+}
+
+/**
+ * Hash an image (base64 / data URL) so caches can be keyed on content
+ * without holding on to the full image string.
+ * Returns null when Web Crypto is unavailable (e.g. non-secure contexts)
+ */
+export async function hashImage(imageBase64: string): Promise<string | null> {
+  if (typeof crypto === 'undefined' || !crypto.subtle) {
+    return null
+  }
+
+  try {
+    const digest = await crypto.subtle.digest('SHA-256', new TextEncoder().encode(imageBase64))
+    return Array.from(new Uint8Array(digest), byte => byte.toString(16).padStart(2, '0')).join('')
+  } catch {
+    return null
+  }
+}
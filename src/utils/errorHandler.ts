@@ -27,6 +27,12 @@ export class ValidationError extends Error {
   }
 }
 
+// Keyword classifiers for generic error messages - each is a single
+// case-insensitive scan, so the message is never lower-cased and re-scanned
+const NETWORK_ERROR_PATTERN = /network|fetch/i
+const TIMEOUT_ERROR_PATTERN = /timeout/i
+const CAMERA_ERROR_PATTERN = /camera|permission/i
+
 /**
  * Parse error and return user-friendly message
  */
@@ -62,17 +68,17 @@ export function getUserFriendlyError(error: unknown): string {
   
   if (error instanceof Error) {
     // Handle specific error messages
-    const message = error.message.toLowerCase()
+    const message = error.message
     
-    if (message.includes('network') || message.includes('fetch')) {
+    if (NETWORK_ERROR_PATTERN.test(message)) {
       return 'Network connection failed. Please check your internet connection.'
     }
     
-    if (message.includes('timeout')) {
+    if (TIMEOUT_ERROR_PATTERN.test(message)) {
       return 'Request timed out. Please try again.'
     }
     
-    if (message.includes('camera') || message.includes('permission')) {
+    if (CAMERA_ERROR_PATTERN.test(message)) {
       return 'Camera access denied. Please allow camera permissions in your browser settings.'
     }
     
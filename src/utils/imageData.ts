@@ -0,0 +1,18 @@
+/**
+ * Image data helpers shared by the upload / OCR / face / TRUE-ID services
+ */
+
+/**
+ * Convert a base64 data URL (or bare base64 string) to a Blob
+ * The browser decodes data URLs natively via fetch, straight into the Blob's
+ * backing store - no intermediate binary string or Uint8Array copy on the
+ * JS heap, and several images can be decoded concurrently
+ */
+export async function base64ToBlob(base64: string, mimeType: string = 'image/jpeg'): Promise<Blob> {
+  const dataUrl = base64.startsWith('data:') ? base64 : `data:${mimeType};base64,${base64}`
+  const response = await fetch(dataUrl)
+  const blob = await response.blob()
+
+  // Data URLs without a media type decode as text/plain - keep the image type
+  return blob.type.startsWith('image/') ? blob : new Blob([blob], { type: mimeType })
+}
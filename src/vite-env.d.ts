@@ -21,6 +21,7 @@ interface ImportMetaEnv {
   readonly VITE_KAIROS_APP_KEY: string
   readonly VITE_IMAGE_UPLOAD_ENDPOINT: string
   readonly VITE_MAX_IMAGE_SIZE: string
+  readonly VITE_MAX_IMAGE_DIMENSION: string
   readonly VITE_ENABLE_SIMULATION_MODE: string
   readonly VITE_SIMULATION_DELAY: string
 }
@@ -81,58 +81,66 @@ export function consoleToTerminal(): Plugin {
               debug: console.debug.bind(console)
             };
             
+            // Shared replacer - stringifies functions/errors and elides large
+            // data URLs (captured ID / face images) instead of shipping them
+            function logReplacer(key, value) {
+              if (typeof value === 'function') {
+                return '[Function]';
+              }
+              if (typeof value === 'string' && value.length > 256 && value.startsWith('data:')) {
+                return value.slice(0, 48) + '... [' + value.length + ' chars]';
+              }
+              if (value instanceof Error) {
+                return {
+                  type: 'Error',
+                  name: value.name,
+                  message: value.message
+                };
+              }
+              return value;
+            }
+            
+            // Serialize one argument straight to JSON text (no parse/re-stringify round-trip)
+            function serializeArg(arg) {
+              // Handle different types of arguments
+              if (arg instanceof Error) {
+                return JSON.stringify({
+                  type: 'Error',
+                  name: arg.name,
+                  message: arg.message,
+                  stack: arg.stack
+                });
+              }
+              if (arg instanceof HTMLElement) {
+                return JSON.stringify({
+                  type: 'HTMLElement',
+                  tagName: arg.tagName,
+                  id: arg.id,
+                  className: arg.className
+                });
+              }
+              try {
+                const json = JSON.stringify(arg, logReplacer);
+                return json === undefined ? 'null' : json;
+              } catch {
+                // Circular references etc.
+                return JSON.stringify(String(arg));
+              }
+            }
+            
             function sendToTerminal(level, args) {
               try {
-                const logData = {
-                  level: level,
-                  args: args.map(arg => {
-                    // Handle different types of arguments
-                    if (arg instanceof Error) {
-                      return {
-                        type: 'Error',
-                        name: arg.name,
-                        message: arg.message,
-                        stack: arg.stack
-                      };
-                    }
-                    if (arg instanceof HTMLElement) {
-                      return {
-                        type: 'HTMLElement',
-                        tagName: arg.tagName,
-                        id: arg.id,
-                        className: arg.className
-                      };
-                    }
-                    if (typeof arg === 'object' && arg !== null) {
-                      try {
-                        // Try to serialize, but handle circular references
-                        return JSON.parse(JSON.stringify(arg, (key, value) => {
-                          if (typeof value === 'function') {
-                            return '[Function]';
-                          }
-                          if (value instanceof Error) {
-                            return {
-                              type: 'Error',
-                              name: value.name,
-                              message: value.message
-                            };
-                          }
-                          return value;
-                        }));
-                      } catch {
-                        return String(arg);
-                      }
-                    }
-                    return arg;
-                  }),
-                  timestamp: new Date().toISOString()
-                };
+                // Assemble the request body from pre-serialized arguments so each
+                // argument is serialized exactly once
+                const body = '{"level":' + JSON.stringify(level) +
+                  ',"args":[' + args.map(serializeArg).join(',') + ']' +
+                  ',"timestamp":' + JSON.stringify(new Date().toISOString()) + '}';
                 
                 // Send to dev server (will silently fail in production)
                 fetch('/__console-log', {
                   method: 'POST',
                   headers: { 'Content-Type': 'application/json' },
-                  body: JSON.stringify(logData)
+                  body: body
                 }).catch(() => {
                   // Silently fail if server is not available (e.g., in production)
                 });